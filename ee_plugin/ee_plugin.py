@@ -5,19 +5,34 @@ Main plugin file.
 
 from __future__ import absolute_import
 
-import configparser
 import json
 import os.path
+import time
 import webbrowser
 from builtins import object
-from typing import cast
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Optional, cast
 
-import requests  # type: ignore
+from packaging.version import InvalidVersion, Version
 from qgis import gui, processing
-from qgis.core import QgsProject, QgsApplication
+from qgis.core import QgsProject, QgsApplication, QgsNetworkAccessManager
 from qgis.PyQt import QtWidgets
-from qgis.PyQt.QtCore import QCoreApplication, QSettings, QTranslator, qVersion, Qt
+from qgis.PyQt.QtCore import (
+    QCoreApplication,
+    QObject,
+    QSettings,
+    QStandardPaths,
+    QTranslator,
+    QUrl,
+    Qt,
+    pyqtSignal,
+)
 from qgis.PyQt.QtGui import QIcon
+from qgis.PyQt.QtNetwork import (
+    QNetworkReply,
+    QNetworkRequest,
+)
 import ee
 
 from . import provider, config, ee_auth, utils, logging
@@ -28,18 +43,87 @@ from .processing.add_image_collection import (
     AddImageCollectionAlgorithmDialog,
 )
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 PLUGIN_DIR = os.path.dirname(__file__)
+ICONS_DIR = os.path.join(PLUGIN_DIR, "icons") + os.sep
+
 
-# read the plugin version from metadata
-cfg = configparser.ConfigParser()
-cfg.read(os.path.join(PLUGIN_DIR, "metadata.txt"))
-VERSION = cfg.get("general", "version")
+def _read_version() -> str:
+    """Read the plugin version from metadata.txt without a full INI parse."""
+    with open(os.path.join(PLUGIN_DIR, "metadata.txt"), "rb") as f:
+        for line in f:
+            if line.startswith(b"version="):
+                return line.split(b"=", 1)[1].strip().decode()
+    raise ValueError("No version found in metadata.txt")
+
+
+VERSION = _read_version()
 version_checked = False
+LATEST_VERSION_URL = "https://qgis-ee-plugin.appspot.com/get_latest_version"
+VERSION_CACHE_PATH = os.path.join(
+    QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation),
+    "qgis-ee-plugin",
+    "latest_version.json",
+)
+VERSION_CACHE_MAX_AGE = 24 * 60 * 60  # seconds
 
 
+@lru_cache(maxsize=32)
 def icon(icon_name: str) -> QIcon:
-    """Helper function to return an icon from the plugin directory."""
-    return QIcon(os.path.join(PLUGIN_DIR, "icons", icon_name))
+    """Helper function to return an icon from the plugin directory.
+
+    Icons are cached, so each file is only loaded once.
+    """
+    return QIcon(ICONS_DIR + icon_name)
+
+
+def _read_version_cache() -> dict:
+    """Read the cached latest-version lookup, or an empty dict if unavailable."""
+    try:
+        with open(VERSION_CACHE_PATH) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    # ignore anything we did not write ourselves, including timestamps in the
+    # future which would otherwise never expire
+    if (
+        not isinstance(cache, dict)
+        or not isinstance(cache.get("version"), str)
+        or not isinstance(cache.get("etag"), str)
+        or not isinstance(cache.get("last_checked"), (int, float))
+        or isinstance(cache["last_checked"], bool)
+        or cache["last_checked"] > time.time()
+    ):
+        return {}
+    return cache
+
+
+def _write_version_cache(latest_version: str, etag: str) -> None:
+    """Persist the latest-version lookup so it can be reused across sessions."""
+    try:
+        os.makedirs(os.path.dirname(VERSION_CACHE_PATH), exist_ok=True)
+        with open(VERSION_CACHE_PATH, "w") as f:
+            json.dump(
+                {
+                    "version": latest_version,
+                    "etag": etag,
+                    "last_checked": time.time(),
+                },
+                f,
+            )
+    except OSError as e:
+        print(f"Could not write plugin version cache: {e}")
+
+
+class _LayerSignals(QObject):
+    # (future, (generation, layer_id, key, name, shown, opacity)) for a finished
+    # _prepare_ee_layer job
+    prepared = pyqtSignal(object)
 
 
 class GoogleEarthEnginePlugin(object):
@@ -62,6 +146,24 @@ class GoogleEarthEnginePlugin(object):
         self.ee_config = ee_config
         self.menu = None
         self.toolButton = None
+        self.set_cloud_project_action = None
+
+        # Network access for the non-blocking plugin version check, using the
+        # proxy, SSL and auth settings configured in QGIS
+        self._nam = QgsNetworkAccessManager.instance()
+        self._version_reply = None
+
+        # Workers for deserializing EE layers and fetching their tile URLs
+        self._layer_pool = ThreadPoolExecutor(max_workers=8)
+        # Bumped on every _updateLayers run so stale results can be dropped
+        self._update_layers_generation = 0
+        # Finished jobs are posted back to the GUI thread to update the layers
+        self._layer_signals = _LayerSignals()
+        self._layer_signals.prepared.connect(
+            self._apply_prepared_ee_layer, Qt.ConnectionType.QueuedConnection
+        )
+        # Deserialized EE objects and vis params, keyed by their saved JSON
+        self._ee_layer_cache = {}
 
         # initialize locale
         locale = str(QSettings().value("locale/userLocale"))[0:2]
@@ -71,18 +173,15 @@ class GoogleEarthEnginePlugin(object):
         if os.path.exists(locale_path):
             self.translator = QTranslator()
             self.translator.load(locale_path)
-
-            if qVersion() > "4.3.3":
-                QCoreApplication.installTranslator(self.translator)
+            QCoreApplication.installTranslator(self.translator)
 
         # Create and register the EE data providers
         provider.register_data_provider()
 
         # Reload the plugin when the config changes
         self.ee_config.signals.updated.connect(
-            lambda: self.set_cloud_project_action.setText(
-                self.tr(self._project_button_text)
-            )
+            self._update_project_button_text,
+            Qt.ConnectionType.DirectConnection,
         )
 
         logging.setup_logger(plugin_name="Google Earth Engine Plugin")
@@ -107,6 +206,43 @@ class GoogleEarthEnginePlugin(object):
         self.provider = EEProcessingProvider(icon=icon("earth-engine.svg"))
         QgsApplication.processingRegistry().addProvider(self.provider)
 
+        # Initialize plugin menu
+        plugin_menu = cast(QtWidgets.QMenu, self.iface.pluginMenu())
+        self.menu = plugin_menu.addMenu(
+            icon("earth-engine.svg"),
+            self.tr("&Google Earth Engine"),
+        )
+
+        # Initialize toolbar menu
+        self.toolButton = QtWidgets.QToolButton()
+        self.toolButton.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonIconOnly)
+        self.toolButton.setPopupMode(
+            QtWidgets.QToolButton.ToolButtonPopupMode.InstantPopup
+        )
+        self.toolButton.setMenu(QtWidgets.QMenu())
+        self.toolButton.setDefaultAction(
+            QtWidgets.QAction(
+                icon=icon("earth-engine.svg"),
+                text=f'<strong>{self.tr("Google Earth Engine")}</strong>',
+                parent=self.iface.mainWindow(),
+            )
+        )
+        self.iface.pluginToolBar().addWidget(self.toolButton)
+
+        # Build actions and populate menus the first time either menu is opened
+        for m in (self.menu, self.toolButton.menu()):
+            m.aboutToShow.connect(self._populate_menus_once)
+
+        # Register signal to initialize EE layers on project load
+        self.iface.projectRead.connect(
+            self._updateLayers, Qt.ConnectionType.DirectConnection
+        )
+
+    def _populate_menus_once(self):
+        """Build the plugin actions and populate both plugin menus."""
+        for m in (self.menu, self.toolButton.menu()):
+            m.aboutToShow.disconnect(self._populate_menus_once)
+
         # Build actions
         ee_user_guide_action = QtWidgets.QAction(
             icon=icon("earth-engine.svg"),
@@ -143,9 +279,7 @@ class GoogleEarthEnginePlugin(object):
         add_image_collection_button = QtWidgets.QAction(
             text=self.tr("Add Image Collection"),
             parent=self.iface.mainWindow(),
-            triggered=lambda: AddImageCollectionAlgorithmDialog(
-                AddImageCollectionAlgorithm(), self.iface.mainWindow()
-            ).exec_(),
+            triggered=self._run_cmd_add_image_collection,
         )
 
         export_geotiff_button = QtWidgets.QAction(
@@ -154,56 +288,28 @@ class GoogleEarthEnginePlugin(object):
             triggered=lambda: processing.execAlgorithmDialog("ee:export_geotiff"),
         )
 
-        # Initialize plugin menu
-        plugin_menu = cast(QtWidgets.QMenu, self.iface.pluginMenu())
-        self.menu = plugin_menu.addMenu(
-            icon("earth-engine.svg"),
-            self.tr("&Google Earth Engine"),
-        )
-
-        # Initialize toolbar menu
-        self.toolButton = QtWidgets.QToolButton()
-        self.toolButton.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonIconOnly)
-        self.toolButton.setPopupMode(
-            QtWidgets.QToolButton.ToolButtonPopupMode.InstantPopup
-        )
-        self.toolButton.setMenu(QtWidgets.QMenu())
-        self.toolButton.setDefaultAction(
-            QtWidgets.QAction(
-                icon=icon("earth-engine.svg"),
-                text=f'<strong>{self.tr("Google Earth Engine")}</strong>',
-                parent=self.iface.mainWindow(),
-            )
-        )
-        self.iface.pluginToolBar().addWidget(self.toolButton)
-
         # Populate menus
-        for m in (self.menu, self.toolButton.menu()):
-            menus.populate_menu(
-                menu=m,
-                items=[
-                    menus.Action(action=ee_user_guide_action),
-                    menus.Separator(),
-                    menus.Action(action=sign_in_action),
-                    menus.Action(action=self.set_cloud_project_action),
-                    menus.Separator(),
-                    menus.SubMenu(
-                        label=self.tr("Add Layer"),
-                        subitems=[
-                            menus.Action(action=add_fc_button),
-                            menus.Action(action=add_ee_image_button),
-                            menus.Action(action=add_image_collection_button),
-                        ],
-                    ),
-                    menus.SubMenu(
-                        label=self.tr("Export"),
-                        subitems=[menus.Action(action=export_geotiff_button)],
-                    ),
+        items = [
+            menus.Action(action=ee_user_guide_action),
+            menus.Separator(),
+            menus.Action(action=sign_in_action),
+            menus.Action(action=self.set_cloud_project_action),
+            menus.Separator(),
+            menus.SubMenu(
+                label=self.tr("Add Layer"),
+                subitems=[
+                    menus.Action(action=add_fc_button),
+                    menus.Action(action=add_ee_image_button),
+                    menus.Action(action=add_image_collection_button),
                 ],
-            )
-
-        # Register signal to initialize EE layers on project load
-        self.iface.projectRead.connect(self._updateLayers)
+            ),
+            menus.SubMenu(
+                label=self.tr("Export"),
+                subitems=[menus.Action(action=export_geotiff_button)],
+            ),
+        ]
+        for m in (self.menu, self.toolButton.menu()):
+            menus.populate_menu(menu=m, items=items)
 
     def unload(self):
         if self.menu:
@@ -215,11 +321,26 @@ class GoogleEarthEnginePlugin(object):
         except RuntimeError as e:
             print(f"Error deleting toolButton: {e}")
 
+        if self._version_reply is not None:
+            # abort() emits finished synchronously, don't report it as an error
+            self._version_reply.finished.disconnect()
+            self._version_reply.abort()
+            self._version_reply.deleteLater()
+            self._version_reply = None
+
+        self._layer_signals.prepared.disconnect()
+        self._layer_pool.shutdown(wait=False, cancel_futures=True)
+
         if self.provider in QgsApplication.processingRegistry().providers():
             QgsApplication.processingRegistry().removeProvider(self.provider)
 
         logging.teardown_logger()
 
+    def _update_project_button_text(self):
+        # the action only exists once the plugin menu has been opened
+        if self.set_cloud_project_action:
+            self.set_cloud_project_action.setText(self.tr(self._project_button_text))
+
     @property
     def _project_button_text(self):
         """Get the text for the project button."""
@@ -241,41 +362,94 @@ class GoogleEarthEnginePlugin(object):
     def _run_cmd_set_cloud_project(self):
         ee_auth.ee_initialize_with_project(self.ee_config, force=True)
 
+    def _run_cmd_add_image_collection(self):
+        AddImageCollectionAlgorithmDialog(
+            AddImageCollectionAlgorithm(), self.iface.mainWindow()
+        ).exec_()
+
     def check_version(self):
+        """Check for a newer plugin version without blocking the GUI thread."""
         global version_checked
 
-        if version_checked:
+        if version_checked or self._version_reply is not None:
+            return
+
+        # Reuse a recent lookup rather than hitting the server every session
+        cache = _read_version_cache()
+        if cache and time.time() - cache["last_checked"] < VERSION_CACHE_MAX_AGE:
+            self._notify_if_outdated(cache["version"])
+            version_checked = True
             return
 
+        request = QNetworkRequest(QUrl(LATEST_VERSION_URL))
+        request.setTransferTimeout(10000)
+        if cache and cache["etag"]:
+            request.setRawHeader(b"If-None-Match", cache["etag"].encode())
+        self._version_reply = self._nam.get(request)
+        self._version_reply.finished.connect(
+            lambda: self._on_version_reply_finished(cache)
+        )
+
+    def _on_version_reply_finished(self, cache: dict):
+        global version_checked
+
+        reply = self._version_reply
+        self._version_reply = None
+
         try:
-            # Attempt to get the latest version from the server
-            latest_version = requests.get(
-                "https://qgis-ee-plugin.appspot.com/get_latest_version",
-                # requires requests > 2.4, can through requests.exceptions.Timeout (which is a RequestException, so already handled)
-                timeout=10,
-            ).text
-
-            if VERSION < latest_version:
-                self.iface.messageBar().pushMessage(
-                    "Earth Engine plugin:",
-                    "There is a more recent version of the ee_plugin available {0} and you have {1}, please upgrade!".format(
-                        latest_version, VERSION
-                    ),
-                    duration=15,
+            if reply.error() != QNetworkReply.NetworkError.NoError:
+                print(
+                    f"HTTP error occurred when checking for recent plugin version: {reply.errorString()}"
                 )
-        except requests.RequestException as e:
-            print(f"HTTP error occurred when checking for recent plugin version: {e}")
+                return
+
+            status = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+            if status == 304:
+                # Not modified, the cached version is still current
+                latest_version = cache["version"]
+                etag = cache["etag"]
+            else:
+                latest_version = bytes(reply.readAll()).decode().strip()
+                etag = bytes(reply.rawHeader(b"ETag")).decode()
+
+            _write_version_cache(latest_version, etag)
+            self._notify_if_outdated(latest_version)
         except ValueError as e:
             print(f"Value error occurred: {e}")
         except Exception as e:
             print(f"An unexpected error occurred: {e}")
         finally:
             version_checked = True
+            reply.deleteLater()
+
+    def _notify_if_outdated(self, latest_version: str):
+        """Tell the user when a more recent plugin version is available."""
+        try:
+            is_outdated = Version(VERSION) < Version(latest_version)
+        except InvalidVersion as e:
+            print(f"Invalid version when checking for recent plugin version: {e}")
+            return
+
+        if is_outdated:
+            self.iface.messageBar().pushMessage(
+                "Earth Engine plugin:",
+                "There is a more recent version of the ee_plugin available {0} and you have {1}, please upgrade!".format(
+                    latest_version, VERSION
+                ),
+                duration=15,
+            )
 
     def _updateLayers(self):
-        layers = QgsProject.instance().mapLayers().values()
+        project = QgsProject.instance()
+        layer_tree_root = project.layerTreeRoot()
+        keys = set()
+        self._update_layers_generation += 1
+        generation = self._update_layers_generation
+
+        for layer in project.mapLayers().values():
+            if not layer.customProperty("ee-layer"):
+                continue
 
-        for layer in filter(lambda layer: layer.customProperty("ee-layer"), layers):
             ee_object = layer.customProperty("ee-object")
             ee_object_vis = layer.customProperty("ee-object-vis")
 
@@ -285,24 +459,82 @@ class GoogleEarthEnginePlugin(object):
                 print(
                     "\nWARNING:\n Map layer saved with older version of EE plugin is detected, backward-compatibility for versions before 0.0.3 is not supported due to changes in EE library, please re-create EE layer by re-running the Python script\n"
                 )
-                return
-
-            ee_object = ee.deserializer.fromJSON(ee_object)
-
-            if ee_object_vis is not None:
-                ee_object_vis = json.loads(ee_object_vis)
-
-            # update loaded EE layer
+                break
 
             # get existing values for name, visibility, and opacity
             # TODO: this should not be needed, refactor add_or_update_ee_layer to update_ee_layer
             name = layer.name()
-            shown = (
-                QgsProject.instance()
-                .layerTreeRoot()
-                .findLayer(layer.id())
-                .itemVisibilityChecked()
-            )
+            node = layer_tree_root.findLayer(layer.id())
+            shown = node.itemVisibilityChecked() if node else True
             opacity = layer.renderer().opacity()
 
-            utils.add_or_update_ee_layer(ee_object, ee_object_vis, name, shown, opacity)
+            key = (ee_object, ee_object_vis)
+            keys.add(key)
+            future = self._layer_pool.submit(
+                self._prepare_ee_layer,
+                ee_object,
+                ee_object_vis,
+                self._ee_layer_cache.get(key),
+            )
+            layer_args = (generation, layer.id(), key, name, shown, opacity)
+            future.add_done_callback(partial(self._post_prepared_ee_layer, layer_args))
+
+        # only keep entries for layers still in the project
+        self._ee_layer_cache = {
+            key: value for key, value in self._ee_layer_cache.items() if key in keys
+        }
+
+    def _post_prepared_ee_layer(self, layer_args, future):
+        # runs on the worker thread, the queued signal hands over to the GUI
+        self._layer_signals.prepared.emit((future, layer_args))
+
+    def _apply_prepared_ee_layer(self, result):
+        """Update a loaded EE layer once its worker job has finished."""
+        future, (generation, layer_id, key, name, shown, opacity) = result
+
+        # the project may have been reloaded, or the layer removed, meanwhile
+        if (
+            generation != self._update_layers_generation
+            or QgsProject.instance().mapLayer(layer_id) is None
+        ):
+            return
+
+        try:
+            ee_object, ee_object_vis, tile_url = future.result()
+        except Exception as e:
+            print(f"Could not load EE layer {name}: {e}")
+            return
+
+        self._ee_layer_cache[key] = (ee_object, ee_object_vis)
+        utils.add_or_update_ee_layer(
+            ee_object, ee_object_vis, name, shown, opacity, tile_url=tile_url
+        )
+
+    @staticmethod
+    def _prepare_ee_layer(
+        ee_object: str,
+        ee_object_vis: Optional[str],
+        cached: Optional[tuple] = None,
+    ):
+        """Deserialize a saved EE layer and request its tile URL.
+
+        Runs on a worker thread, so it must not touch QGIS project state.
+        Deserialization is skipped when a cached result is given.
+
+        The provider's getInfo() calls are not prefetched here: saved layers
+        are found by name and replaced through update_ee_image_layer, which
+        never calls set_ee_object.
+        """
+        if cached is not None:
+            ee_object, ee_object_vis = cached
+        else:
+            ee_object = ee.deserializer.fromJSON(ee_object)
+
+            if ee_object_vis is not None:
+                ee_object_vis = _json_loads(ee_object_vis)
+
+        tile_url = None
+        if isinstance(ee_object, ee.Image):
+            tile_url = utils.get_ee_image_url(ee_object.visualize(**ee_object_vis))
+
+        return ee_object, ee_object_vis, tile_url
@@ -79,10 +79,13 @@ def add_or_update_ee_layer(
     name: str,
     shown: bool,
     opacity: float,
+    tile_url: Optional[str] = None,
 ) -> QgsMapLayer:
     logger.info(f"Adding/updating EE layer: {name}")
     if isinstance(eeObject, ee.Image):
-        return add_or_update_ee_raster_layer(eeObject, name, vis_params, shown, opacity)
+        return add_or_update_ee_raster_layer(
+            eeObject, name, vis_params, shown, opacity, tile_url=tile_url
+        )
     if isinstance(eeObject, ee.FeatureCollection):
         if is_named_dataset(eeObject):
             return add_or_update_named_vector_layer(
@@ -105,12 +108,17 @@ def add_or_update_ee_raster_layer(
     vis_params: VisualizeParams,
     shown: bool = True,
     opacity: float = 1.0,
+    tile_url: Optional[str] = None,
 ) -> QgsRasterLayer:
     logger.debug(f"Adding/updating EE raster layer: {name}")
     layer = get_layer_by_name(name)
     if layer and layer.customProperty("ee-layer"):
-        return update_ee_image_layer(image, layer, vis_params, shown, opacity)
-    return add_ee_image_layer(image, name, vis_params, shown, opacity)
+        return update_ee_image_layer(
+            image, layer, vis_params, shown, opacity, tile_url=tile_url
+        )
+    return add_ee_image_layer(
+        image, name, vis_params, shown, opacity, tile_url=tile_url
+    )
 
 
 def add_ee_image_layer(
@@ -119,10 +127,13 @@ def add_ee_image_layer(
     vis_params: VisualizeParams,
     shown: bool,
     opacity: float,
+    tile_url: Optional[str] = None,
 ) -> QgsRasterLayer:
     logger.debug(f"Adding EE image layer: {name}")
     check_version()
-    url = "type=xyz&url=" + get_ee_image_url(image.visualize(**vis_params))
+    url = "type=xyz&url=" + (
+        tile_url or get_ee_image_url(image.visualize(**vis_params))
+    )
     layer = QgsRasterLayer(url, name, "EE")
     assert layer.isValid(), f"Failed to load layer: {name}"
     layer.dataProvider().set_ee_object(image)
@@ -140,10 +151,13 @@ def update_ee_image_layer(
     vis_params: VisualizeParams,
     shown: bool = True,
     opacity: float = 1.0,
+    tile_url: Optional[str] = None,
 ) -> QgsRasterLayer:
     logger.debug(f"Updating EE image layer: {layer.name()}")
     check_version()
-    url = "type=xyz&url=" + get_ee_image_url(image.visualize(**vis_params))
+    url = "type=xyz&url=" + (
+        tile_url or get_ee_image_url(image.visualize(**vis_params))
+    )
     qgis_instance = QgsProject.instance()
     root = qgis_instance.layerTreeRoot()
     layer_node = root.findLayer(layer.id())
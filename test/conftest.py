@@ -1,5 +1,5 @@
 import ee
-from pytest import fixture
+from pytest import MonkeyPatch, fixture
 from qgis.gui import QgisInterface
 from qgis.utils import plugins
 from PyQt5.QtCore import QSettings, QCoreApplication
@@ -21,7 +21,16 @@ def ee_config():
 
 
 @fixture(scope="session", autouse=True)
-def load_ee_plugin(qgis_app, setup_ee, ee_config):
+def version_cache_path(tmp_path_factory):
+    """Keep the plugin version cache out of the developer's cache directory."""
+    path = tmp_path_factory.mktemp("version_cache") / "latest_version.json"
+    with MonkeyPatch.context() as mp:
+        mp.setattr(ee_plugin, "VERSION_CACHE_PATH", str(path))
+        yield path
+
+
+@fixture(scope="session", autouse=True)
+def load_ee_plugin(qgis_app, setup_ee, ee_config, version_cache_path):
     """Load Earth Engine plugin and configure QSettings."""
 
     # Set QSettings values required by the plugin
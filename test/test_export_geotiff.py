@@ -1,5 +1,5 @@
 import os
-import time
+import tempfile
 
 import ee
 import pytest
@@ -55,6 +55,20 @@ def test_requires_extent():
         )
 
 
+@pytest.fixture(scope="module")
+def dem_image_layer():
+    """Add the DEM layer once and reuse it across the parametrized exports."""
+    img = ee.Image("USGS/SRTMGL1_003")
+    return Map.addLayer(img, {}, "DEM")
+
+
+@pytest.fixture
+def dem_layer(clean_qgis_iface, dem_image_layer):
+    """Put the shared DEM layer back on the canvas after it has been cleared."""
+    clean_qgis_iface.mapCanvas().setLayers([dem_image_layer])
+    return dem_image_layer.name()
+
+
 @pytest.mark.parametrize(
     "crs, scale, extent",
     [
@@ -66,18 +80,16 @@ def test_requires_extent():
         ("EPSG:32610", 5000, (5100, 54000, 5150, 54100)),  # UTM Zone 10N
     ],
 )
-def test_varied_params_export(crs, scale, extent):
-    time.sleep(1)  # connection pool can get full
-    img = ee.Image("USGS/SRTMGL1_003")
-    Map.addLayer(img, {}, "DEM")  # Add a layer to the map
+def test_varied_params_export(crs, scale, extent, dem_layer):
     alg = ExportGeoTIFFAlgorithm()
     alg.initAlgorithm(config=None)
 
     context = QgsProcessingContext()
     feedback = QgsProcessingFeedback()
-    alg.raster_layers = ["DEM"]
+    alg.raster_layers = [dem_layer]
 
-    out_path = f"test_{crs}_{scale}.tif"
+    fd, out_path = tempfile.mkstemp(suffix=".tif")
+    os.close(fd)
 
     extent_rect = QgsRectangle(*extent)
 
@@ -89,16 +101,16 @@ def test_varied_params_export(crs, scale, extent):
         "OUTPUT": out_path,
     }
 
-    alg.processAlgorithm(params, context=context, feedback=feedback)
-
-    assert os.path.exists(out_path)
-    assert os.path.getsize(out_path) > 0
+    try:
+        alg.processAlgorithm(params, context=context, feedback=feedback)
 
-    with rio.open(out_path) as ds:
-        assert ds.count == 1, "Unexpected number of bands"
-        assert ds.width > 0 and ds.height > 0, "Invalid raster size"
+        assert os.stat(out_path).st_size > 0
 
-    os.remove(out_path)
+        with rio.open(out_path) as ds:
+            assert ds.count == 1, "Unexpected number of bands"
+            assert ds.width > 0 and ds.height > 0, "Invalid raster size"
+    finally:
+        os.unlink(out_path)
 
 
 def test_extent_transformed_to_target_crs():
@@ -119,7 +131,8 @@ def test_extent_transformed_to_target_crs():
     # Let's take a small area in meters around Vancouver
     extent_3857 = "-13700000,-13680000,6300000,6320000 [EPSG:3857]"
 
-    out_path = "test_extent_transformed.tif"
+    fd, out_path = tempfile.mkstemp(suffix=".tif")
+    os.close(fd)
     params = {
         "EE_IMAGE": 0,
         "EXTENT": extent_3857,
@@ -128,15 +141,16 @@ def test_extent_transformed_to_target_crs():
         "OUTPUT": out_path,
     }
 
-    alg.processAlgorithm(params, context=context, feedback=feedback)
-
-    with rio.open(out_path) as ds:
-        assert (
-            ds.width < 5000 and ds.height < 5000
-        ), "Raster size indicates extent not transformed correctly"
-        assert (
-            "WGS 84" in ds.crs.to_wkt() or "4326" in ds.crs.to_string()
-        ), f"Unexpected CRS: {ds.crs}"
-        assert ds.count == 1
-
-    os.remove(out_path)
+    try:
+        alg.processAlgorithm(params, context=context, feedback=feedback)
+
+        with rio.open(out_path) as ds:
+            assert (
+                ds.width < 5000 and ds.height < 5000
+            ), "Raster size indicates extent not transformed correctly"
+            assert (
+                "WGS 84" in ds.crs.to_wkt() or "4326" in ds.crs.to_string()
+            ), f"Unexpected CRS: {ds.crs}"
+            assert ds.count == 1
+    finally:
+        os.unlink(out_path)
@@ -0,0 +1,190 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import ee
+import pytest
+from qgis.core import QgsProject, QgsRasterLayer
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.PyQt.QtNetwork import QNetworkReply
+from qgis.utils import plugins
+
+from ee_plugin import ee_plugin, utils
+
+RASTER_PATH = os.path.join(os.path.dirname(__file__), "data", "tenbytenraster.asc")
+
+
+@pytest.fixture
+def plugin(monkeypatch, version_cache_path):
+    """The loaded plugin with its network and message bar replaced by mocks."""
+    plugin = plugins["ee_plugin"]
+    monkeypatch.setattr(plugin, "iface", MagicMock())
+    monkeypatch.setattr(plugin, "_nam", MagicMock())
+    monkeypatch.setattr(plugin, "_version_reply", None)
+    monkeypatch.setattr(ee_plugin, "version_checked", False)
+    yield plugin
+    version_cache_path.unlink(missing_ok=True)
+
+
+def write_version_cache(path, **cache):
+    path.write_text(json.dumps(cache))
+
+
+def test_fresh_version_cache_skips_request(plugin, version_cache_path):
+    write_version_cache(
+        version_cache_path, version="99.0.0", etag='"abc"', last_checked=time.time()
+    )
+
+    plugin.check_version()
+
+    plugin._nam.get.assert_not_called()
+    plugin.iface.messageBar().pushMessage.assert_called_once()
+    assert ee_plugin.version_checked
+
+
+def test_stale_version_cache_revalidates_with_etag(plugin, version_cache_path):
+    write_version_cache(
+        version_cache_path,
+        version="99.0.0",
+        etag='"abc"',
+        last_checked=time.time() - 2 * ee_plugin.VERSION_CACHE_MAX_AGE,
+    )
+
+    plugin.check_version()
+
+    plugin._nam.get.assert_called_once()
+    request = plugin._nam.get.call_args[0][0]
+    assert bytes(request.rawHeader(b"If-None-Match")) == b'"abc"'
+    assert not ee_plugin.version_checked
+
+
+def test_not_modified_reply_reuses_cached_version(plugin, version_cache_path):
+    cache = {"version": "99.0.0", "etag": '"abc"', "last_checked": 0}
+    reply = MagicMock()
+    reply.error.return_value = QNetworkReply.NetworkError.NoError
+    reply.attribute.return_value = 304
+    plugin._version_reply = reply
+
+    plugin._on_version_reply_finished(cache)
+
+    reply.readAll.assert_not_called()
+    plugin.iface.messageBar().pushMessage.assert_called_once()
+    written = json.loads(version_cache_path.read_text())
+    assert written["version"] == "99.0.0"
+    assert written["etag"] == '"abc"'
+    assert written["last_checked"] > 0
+    assert ee_plugin.version_checked
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        "null",
+        "[]",
+        '"0.1.0"',
+        json.dumps({"version": "0.1.0", "etag": "", "last_checked": "yesterday"}),
+        json.dumps({"version": "0.1.0", "etag": 1, "last_checked": 0}),
+        json.dumps({"version": "0.1.0", "etag": "", "last_checked": 1e12}),
+    ],
+)
+def test_invalid_version_cache_is_ignored(plugin, version_cache_path, contents):
+    version_cache_path.write_text(contents)
+
+    assert ee_plugin._read_version_cache() == {}
+
+    plugin.check_version()
+    plugin._nam.get.assert_called_once()
+
+
+def test_update_layers_uses_each_layers_prefetched_tile_url(plugin, monkeypatch):
+    monkeypatch.setattr(
+        utils, "get_ee_image_url", MagicMock(side_effect=lambda img: img.serialize())
+    )
+    add_or_update = MagicMock()
+    monkeypatch.setattr(utils, "add_or_update_ee_layer", add_or_update)
+
+    layers = []
+    for name, value in (("prefetch_a", 1), ("prefetch_b", 2)):
+        layer = QgsRasterLayer(RASTER_PATH, name)
+        layer.setCustomProperty("ee-layer", True)
+        layer.setCustomProperty("ee-object", ee.serializer.toJSON(ee.Image(value)))
+        layer.setCustomProperty("ee-object-vis", json.dumps({"min": 0, "max": value}))
+        layers.append(layer)
+    project = QgsProject.instance()
+    project.addMapLayers(layers)
+
+    def applied():
+        return {c.args[2]: c for c in add_or_update.call_args_list}
+
+    try:
+        plugin._updateLayers()
+        # layers are applied through a queued signal, so pump the event loop
+        deadline = time.monotonic() + 10
+        while not {"prefetch_a", "prefetch_b"} <= set(applied()):
+            assert time.monotonic() < deadline, "EE layers were not updated"
+            QCoreApplication.processEvents()
+            time.sleep(0.01)
+    finally:
+        project.removeMapLayers([layer.id() for layer in layers])
+
+    tile_urls = {}
+    for name, call in applied().items():
+        ee_object, ee_object_vis = call.args[:2]
+        tile_urls[name] = call.kwargs["tile_url"]
+        assert tile_urls[name] == ee_object.visualize(**ee_object_vis).serialize()
+    assert tile_urls["prefetch_a"] != tile_urls["prefetch_b"]
+
+
+def test_update_layers_drops_results_for_removed_layers(plugin, monkeypatch):
+    monkeypatch.setattr(
+        utils, "get_ee_image_url", MagicMock(side_effect=lambda img: img.serialize())
+    )
+    add_or_update = MagicMock()
+    monkeypatch.setattr(utils, "add_or_update_ee_layer", add_or_update)
+    layer_pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(plugin, "_layer_pool", layer_pool)
+
+    layers = []
+    for name, value in (("removed_a", 1), ("removed_b", 2)):
+        layer = QgsRasterLayer(RASTER_PATH, name)
+        layer.setCustomProperty("ee-layer", True)
+        layer.setCustomProperty("ee-object", ee.serializer.toJSON(ee.Image(value)))
+        layer.setCustomProperty("ee-object-vis", json.dumps({"min": 0, "max": value}))
+        layers.append(layer)
+    project = QgsProject.instance()
+    project.addMapLayers(layers)
+
+    plugin._updateLayers()
+    project.removeMapLayers([layer.id() for layer in layers])
+
+    # wait for the workers, then deliver their queued results
+    layer_pool.shutdown(wait=True)
+    QCoreApplication.processEvents()
+
+    add_or_update.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "current, latest, prompted",
+    [
+        ("0.10.0", "0.9.0", False),
+        ("0.9.0", "0.10.0", True),
+        ("0.0.9", "0.0.9", False),
+    ],
+)
+def test_notify_if_outdated_compares_versions(
+    plugin, monkeypatch, current, latest, prompted
+):
+    monkeypatch.setattr(ee_plugin, "VERSION", current)
+
+    plugin._notify_if_outdated(latest)
+
+    assert plugin.iface.messageBar().pushMessage.called == prompted
+
+
+def test_notify_if_outdated_ignores_invalid_version(plugin):
+    plugin._notify_if_outdated("<html>not a version</html>")
+
+    plugin.iface.messageBar().pushMessage.assert_not_called()